@@ -0,0 +1,264 @@
+# forecasting.py
+"""
+Incremental Holt-Winters forecasting.
+
+`IncrementalForecaster` keeps the last statsmodels fit per series. When new
+days are appended it warm-starts the optimizer from the previous parameters
+instead of running the full grid search, and falls back to a full refit on
+schedule or when the one-step-ahead error on the new days drifts.
+
+The NumPy functions implement additive Holt-Winters (additive trend and
+season, no damping, same recursions as statsmodels) over a 2-D array so
+level, trend and season of many series are updated at once.
+"""
+
+import threading
+import warnings
+
+import numpy as np
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+DEFAULT_GRID = np.array([0.0, 0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9])
+
+
+# ==============================
+# NUMPY HOLT-WINTERS (ADDITIVE)
+# ==============================
+def holt_winters_filter(Y, alpha, beta, gamma, level, trend, season):
+    """
+    Runs the additive Holt-Winters recursions over every row of `Y`.
+
+    :param Y: (series, days) observations
+    :param alpha, beta, gamma: (series,) smoothing parameters
+    :param level, trend: (series,) states before the first day
+    :param season: (series, m) seasonal states, oldest first
+    :return: (fitted, level, trend, season) where fitted holds the
+        one-step-ahead predictions and the states are after the last day
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    rows, n = Y.shape
+    m = season.shape[1]
+
+    level = np.array(level, dtype=float)
+    trend = np.array(trend, dtype=float)
+    season = np.array(season, dtype=float)
+    fitted = np.empty((rows, n))
+
+    # `season` is a ring buffer: column t % m holds s(t - m) at day t
+    for t in range(n):
+        pos = t % m
+        s = season[:, pos]
+        fitted[:, t] = level + trend + s
+
+        new_level = alpha * (Y[:, t] - s) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, pos] = gamma * (Y[:, t] - fitted[:, t] + s) + (1 - gamma) * s
+        level = new_level
+
+    return fitted, level, trend, np.roll(season, -(n % m), axis=1)
+
+
+def holt_winters_forecast(level, trend, season, horizon):
+    """(series, horizon) forecasts from the states after the last day."""
+    h = np.arange(1, horizon + 1)
+    m = season.shape[1]
+    return level[:, None] + h * trend[:, None] + season[:, (h - 1) % m]
+
+
+def initial_states(Y, m=7):
+    """
+    Starting states from a least-squares line through each series: level and
+    trend come from the line, the seasons are the mean residual of each day
+    of the cycle (centered to sum to zero).
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    rows, n = Y.shape
+    if n < m:
+        raise ValueError(f"At least {m} observations are needed, got {n}")
+    if not np.isfinite(Y).all():
+        # A NaN would poison every SSE and leave the series unfitted
+        raise ValueError("Series must not contain missing values; fill gaps (e.g. with 0) first")
+
+    t = np.arange(n, dtype=float)
+    t_centered = t - t.mean()
+
+    trend = Y @ t_centered / (t_centered ** 2).sum()
+    intercept = Y.mean(axis=1) - trend * t.mean()
+    resid = Y - (intercept[:, None] + trend[:, None] * t)
+
+    cycles = n // m
+    season = resid[:, :cycles * m].reshape(rows, cycles, m).mean(axis=1)
+    season -= season.mean(axis=1, keepdims=True)
+
+    # Level is the state before day 0, one trend step behind the line
+    return intercept - trend, trend, season
+
+
+def fit_holt_winters(Y, m=7, grid=DEFAULT_GRID, max_rows=8192):
+    """
+    Fits additive Holt-Winters to every row of `Y` at once.
+
+    Every (alpha, beta, gamma) combination of `grid` is evaluated for every
+    series with vectorized filter passes; each series keeps the combination
+    with the lowest sum of squared one-step errors. Combinations are run in
+    chunks of at most `max_rows` (series x combination) rows so memory stays
+    bounded for many series.
+
+    :return: dict of (series,) arrays alpha, beta, gamma, sse and the final
+        level, trend and (series, m) season
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    rows = len(Y)
+
+    alpha, beta, gamma = (g.ravel() for g in np.meshgrid(grid, grid, grid, indexing="ij"))
+    level0, trend0, season0 = initial_states(Y, m)
+
+    best = {
+        "alpha": np.zeros(rows), "beta": np.zeros(rows), "gamma": np.zeros(rows),
+        "sse": np.full(rows, np.inf),
+        "level": np.zeros(rows), "trend": np.zeros(rows), "season": np.zeros((rows, m)),
+    }
+    chunk = max(1, max_rows // rows)
+
+    for start in range(0, len(alpha), chunk):
+        a, b, g = alpha[start:start + chunk], beta[start:start + chunk], gamma[start:start + chunk]
+        combos = len(a)
+
+        # Row r * combos + c is series r with parameter combination c
+        Y_rep = np.repeat(Y, combos, axis=0)
+        fitted, level, trend, season = holt_winters_filter(
+            Y_rep, np.tile(a, rows), np.tile(b, rows), np.tile(g, rows),
+            np.repeat(level0, combos), np.repeat(trend0, combos),
+            np.repeat(season0, combos, axis=0),
+        )
+        fitted -= Y_rep
+        sse = (fitted ** 2).sum(axis=1).reshape(rows, combos)
+        del Y_rep, fitted
+
+        idx = sse.argmin(axis=1)
+        chunk_sse = sse[np.arange(rows), idx]
+        better = chunk_sse < best["sse"]
+        picked = (np.arange(rows) * combos + idx)[better]
+
+        best["alpha"][better] = a[idx[better]]
+        best["beta"][better] = b[idx[better]]
+        best["gamma"][better] = g[idx[better]]
+        best["sse"][better] = chunk_sse[better]
+        best["level"][better] = level[picked]
+        best["trend"][better] = trend[picked]
+        best["season"][better] = season[picked]
+
+    return best
+
+
+def forecast_many(Y, horizon, m=7, grid=DEFAULT_GRID):
+    """
+    Fits and forecasts many equal-length series; returns (series, horizon).
+    Days without sales must be filled (e.g. with 0) before calling.
+    """
+    fit = fit_holt_winters(Y, m, grid)
+    return holt_winters_forecast(fit["level"], fit["trend"], fit["season"], horizon)
+
+
+# ==============================
+# INCREMENTAL STATSMODELS ENGINE
+# ==============================
+class IncrementalForecaster:
+    def __init__(self, seasonal_periods=7, full_refit_every=7, drift_tolerance=3.0):
+        """
+        :param full_refit_every: appended days after which a full refit runs
+        :param drift_tolerance: full refit when the RMSE of the one-step
+            errors on new days exceeds this multiple of the fit's RMSE
+        """
+        self.seasonal_periods = seasonal_periods
+        self.full_refit_every = full_refit_every
+        self.drift_tolerance = drift_tolerance
+        self._fits = {}
+        self._lock = threading.Lock()
+
+    def _fit(self, series, start_params=None):
+        model = ExponentialSmoothing(
+            series,
+            trend="add",
+            seasonal="add",
+            seasonal_periods=self.seasonal_periods
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            if start_params is None:
+                return model.fit()
+            return model.fit(start_params=start_params, use_brute=False)
+
+    def _state(self, series, model_fit, days_since_full):
+        p = model_fit.params
+        alpha, beta, gamma = p["smoothing_level"], p["smoothing_trend"], p["smoothing_seasonal"]
+        _, level, trend, season = holt_winters_filter(
+            series.to_numpy()[None, :],
+            np.array([alpha]), np.array([beta]), np.array([gamma]),
+            np.array([p["initial_level"]]), np.array([p["initial_trend"]]),
+            np.asarray(p["initial_seasons"], dtype=float)[None, :],
+        )
+        return {
+            "series": series.copy(),
+            "model_fit": model_fit,
+            "params": (alpha, beta, gamma),
+            "start_params": np.r_[
+                alpha, beta, gamma, p["initial_level"], p["initial_trend"], p["initial_seasons"]
+            ],
+            "level": level,
+            "trend": trend,
+            "season": season,
+            "rmse": np.sqrt(model_fit.sse / len(series)),
+            "days_since_full": days_since_full,
+        }
+
+    def _appended(self, prev, series):
+        old = prev["series"]
+        return (
+            len(series) >= len(old)
+            and series.index[:len(old)].equals(old.index)
+            and np.allclose(series.to_numpy()[:len(old)], old.to_numpy())
+        )
+
+    def update(self, key, series):
+        """
+        Fits `series` for `key`, reusing the previous fit where possible.
+        Returns (model_fit, mode) with mode 'cached', 'warm' or 'full'.
+        """
+        with self._lock:
+            prev = self._fits.get(key)
+
+        if prev is not None and self._appended(prev, series):
+            new = series.to_numpy()[len(prev["series"]):]
+
+            if len(new) == 0:
+                return prev["model_fit"], "cached"
+
+            # One-step-ahead errors of the previous state on the new days
+            alpha, beta, gamma = prev["params"]
+            fitted, _, _, _ = holt_winters_filter(
+                new[None, :], np.array([alpha]), np.array([beta]), np.array([gamma]),
+                prev["level"], prev["trend"], prev["season"],
+            )
+            new_rmse = np.sqrt(np.mean((new - fitted[0]) ** 2))
+            days_since_full = prev["days_since_full"] + len(new)
+
+            if new_rmse <= self.drift_tolerance * prev["rmse"] and days_since_full < self.full_refit_every:
+                model_fit = self._fit(series, start_params=prev["start_params"])
+                mode = "warm"
+            else:
+                model_fit = self._fit(series)
+                mode, days_since_full = "full", 0
+        else:
+            model_fit = self._fit(series)
+            mode, days_since_full = "full", 0
+
+        state = self._state(series, model_fit, days_since_full)
+        with self._lock:
+            self._fits[key] = state
+        return model_fit, mode
+
+    def forecast(self, key, series, horizon):
+        model_fit, _ = self.update(key, series)
+        return model_fit.forecast(horizon)
+
@@ -5,9 +5,13 @@ import pandas as pd
 import numpy as np
 from pymongo import MongoClient
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
+from fastapi.responses import StreamingResponse
+from smartsahuji_analytics.trends import compute_trends
+from smartsahuji_analytics.precompute import Precomputer
+from smartsahuji_analytics.export import MAX_BATCH_SIZE, MEDIA_TYPES, ExportRequestError, export_stream, iter_csv_batches
+from forecasting import IncrementalForecaster
 print("🔥 RUNNING INSIGHTS MAIN.PY 🔥")
 # ==============================
 # LOAD ENV
@@ -28,10 +32,33 @@ client = MongoClient(MONGO_URI)
 db = client[DB_NAME]
 collection = db[COLLECTION_NAME]
 
+DATA_PATH = '../../data/sales_500.csv'
+
+# ==============================
+# BACKGROUND PRECOMPUTATION
+# ==============================
+def data_version():
+    # File size and modification time change whenever the CSV is rewritten
+    stat = os.stat(DATA_PATH)
+    return (stat.st_mtime_ns, stat.st_size)
+
+precomputed = Precomputer(
+    data_version,
+    refresh_interval=int(os.getenv("PRECOMPUTE_INTERVAL", 600)),
+    poll_interval=int(os.getenv("PRECOMPUTE_POLL_INTERVAL", 30)),
+    max_workers=int(os.getenv("PRECOMPUTE_WORKERS", 1)),
+)
+
+# Last Holt-Winters fit per (category, item_type), warm-started as days are appended
+forecaster = IncrementalForecaster(
+    full_refit_every=int(os.getenv("FORECAST_FULL_REFIT_DAYS", 7)),
+    drift_tolerance=float(os.getenv("FORECAST_DRIFT_TOLERANCE", 3.0)),
+)
+
 # ==============================
 # FASTAPI SETUP
 # ==============================
-app = FastAPI()
+app = FastAPI(lifespan=precomputed.lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -47,7 +74,7 @@ app.add_middleware(
 def load_data():
     # data = list(collection.find())
     # df = pd.DataFrame(data)
-    df = pd.read_csv('../../data/sales_500.csv')
+    df = pd.read_csv(DATA_PATH)
     print(f"Df content: {df.head()}")
     print("Loaded rows:", len(df))
 
@@ -97,6 +124,13 @@ def load_data():
 
     return df
 
+# Trend frequencies line up with the period labels ("%U" weeks start on Sunday)
+TREND_FREQS = {
+    "weekly": "W-SAT",
+    "monthly": "M",
+    "yearly": "Y",
+}
+
 @app.get("/insights")
 def insights(
     period: str = "weekly",
@@ -105,7 +139,19 @@ def insights(
     category: str = None,
     item_type: str = None
 ):
-    df = load_data()
+    cached = precomputed.get(
+        "insights", period=period, start_date=start_date, end_date=end_date,
+        category=category, item_type=item_type
+    )
+    if cached is not None:
+        return cached
+
+    return compute_insights(load_data(), period, start_date, end_date, category, item_type)
+
+
+def compute_insights(df, period="weekly", start_date=None, end_date=None, category=None, item_type=None):
+    if period not in TREND_FREQS:
+        raise HTTPException(status_code=400, detail="Invalid period")
 
     if df.empty:
         return {
@@ -119,7 +165,7 @@ def insights(
                 "low_margin_items": [],
                 "high_margin_items": [],
             },
-            "revenue_trends": "Unknown", # After calculation, Upper trend or Lower trend acc to numeric value
+            "revenue_trends": compute_trends(df, freq=TREND_FREQS[period]),
         }
 
     # ==============================
@@ -146,8 +192,6 @@ def insights(
         df["period"] = df["date"].dt.strftime("%Y-%m")
     elif period == "yearly":
         df["period"] = df["date"].dt.strftime("%Y")
-    else:
-        raise HTTPException(status_code=400, detail="Invalid period")
 
     # ==============================
     # Sales
@@ -209,20 +253,8 @@ def insights(
     # ==============================
     # Revenue Trends
     # ==============================
-    revenue = (
-        df.groupby("date")["revenue"]
-        .sum()
-        .reset_index()
-    )
-
-    revenue['pct_change'] = revenue['revenue'].pct_change()
-
-    avg_growth = revenue['pct_change'].mean()
-
-    if avg_growth > 0:
-        revenue_trends = "Upward Trend"
-    else:
-        revenue_trends = "Downward Trend"
+    # Overall and per-category growth, slope and rolling growth in one pass
+    revenue_trends = compute_trends(df, value="revenue", by="category", freq=TREND_FREQS[period])
 
     insight_metadata = {
         "thresholds": {
@@ -258,9 +290,17 @@ def forecast_sales(
     Forecast sales and revenue for the next `period_days`.
     Detect demand spikes in historical and forecasted data.
     """
+    cached = precomputed.get(
+        "forecast", period_days=period_days, category=category,
+        item_type=item_type, spike_threshold=spike_threshold
+    )
+    if cached is not None:
+        return cached
+
+    return compute_forecast(load_data(), period_days, category, item_type, spike_threshold)
 
-    df = load_data()
 
+def compute_forecast(df, period_days=7, category=None, item_type=None, spike_threshold=1.5):
     if df.empty:
         return {
             "forecast": {},
@@ -296,14 +336,7 @@ def forecast_sales(
     # FORECAST USING HOLT-WINTERS
     # ------------------------------
     try:
-        model = ExponentialSmoothing(
-            daily_sales,
-            trend="add",
-            seasonal="add",
-            seasonal_periods=7
-        )
-        model_fit = model.fit()
-        forecast_values = model_fit.forecast(period_days)
+        forecast_values = forecaster.forecast((category, item_type), daily_sales, period_days)
     except Exception as e:
         return {"error": f"Forecasting failed: {str(e)}"}
 
@@ -348,4 +381,75 @@ def forecast_sales(
             "historical_days_used": len(daily_sales),
             "spike_threshold_multiplier": spike_threshold
         }
-    }
\ No newline at end of file
+    }
+
+
+# ==============================
+# BULK EXPORT ENDPOINT
+# ==============================
+@app.get("/export")
+def export_sales(
+    format: str = "arrow",
+    start_date: str = None,
+    end_date: str = None,
+    category: str = None,
+    item_type: str = None,
+    rollup: str = None,
+    period: str = "daily",
+    batch_size: int = Query(65536, gt=0, le=MAX_BATCH_SIZE)
+):
+    """
+    Stream filtered sales rows, or a rollup by `rollup` dimensions
+    (e.g. "period,category"), as Arrow IPC or Parquet record batches.
+    """
+    batches = iter_csv_batches(
+        DATA_PATH, batch_size,
+        start_date=start_date, end_date=end_date, category=category, item_type=item_type
+    )
+    # Reads the first batch, so a missing CSV or Mongo error is a 500, not a cut-off 200
+    try:
+        stream = export_stream(batches, format, rollup, period, batch_size)
+    except ExportRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        stream,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="sales.{format}"'}
+    )
+
+
+# ==============================
+# PRECOMPUTED QUERIES
+# ==============================
+@precomputed.jobs
+def precompute_jobs():
+    """
+    Default dashboard queries: unfiltered weekly insights and the 7-day
+    forecast overall and per category. Data is loaded once per refresh.
+    """
+    df = load_data()
+
+    jobs = [
+        ("insights", {"period": "weekly"}, lambda: compute_insights(df, "weekly")),
+        ("forecast", {"period_days": 7, "spike_threshold": 1.5}, lambda: compute_forecast(df, 7)),
+    ]
+    for cat in sorted(df["category"].dropna().astype(str).unique()):
+        jobs.append((
+            "forecast",
+            {"period_days": 7, "category": cat, "spike_threshold": 1.5},
+            lambda cat=cat: compute_forecast(df, 7, category=cat),
+        ))
+    return jobs
+
+
+@app.get("/precompute/status")
+def precompute_status():
+    return precomputed.status()
+
+
+@app.post("/precompute/refresh")
+def precompute_refresh():
+    # Called after data changes (e.g. uploads) to recompute right away
+    precomputed.invalidate()
+    return {"message": "Refresh scheduled"}
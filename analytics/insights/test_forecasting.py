@@ -0,0 +1,120 @@
+# test_forecasting.py
+"""
+Accuracy parity of the incremental and NumPy Holt-Winters forecasts against
+statsmodels on the sample sales data.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import (
+    IncrementalForecaster,
+    fit_holt_winters,
+    forecast_many,
+    holt_winters_filter,
+    holt_winters_forecast,
+    initial_states,
+)
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "sales_500.csv")
+
+
+@pytest.fixture(scope="module")
+def daily_sales():
+    df = pd.read_csv(DATA_PATH)
+    df["date"] = pd.to_datetime(df["date"])
+    return df.groupby("date")["quantity"].sum().sort_index()
+
+
+@pytest.fixture(scope="module")
+def full_fit(daily_sales):
+    return IncrementalForecaster()._fit(daily_sales)
+
+
+def test_numpy_filter_matches_statsmodels(daily_sales, full_fit):
+    p = full_fit.params
+    fitted, level, trend, season = holt_winters_filter(
+        daily_sales.to_numpy()[None, :],
+        np.array([p["smoothing_level"]]), np.array([p["smoothing_trend"]]),
+        np.array([p["smoothing_seasonal"]]),
+        np.array([p["initial_level"]]), np.array([p["initial_trend"]]),
+        np.asarray(p["initial_seasons"])[None, :],
+    )
+
+    np.testing.assert_allclose(fitted[0], full_fit.fittedvalues.to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(
+        holt_winters_forecast(level, trend, season, 7)[0], full_fit.forecast(7).to_numpy(), rtol=1e-9
+    )
+
+
+def test_warm_fit_matches_full_fit(daily_sales, full_fit):
+    engine = IncrementalForecaster()
+    engine.update("all", daily_sales.iloc[:-3])
+    warm_fit, mode = engine.update("all", daily_sales)
+
+    assert mode == "warm"
+    np.testing.assert_allclose(warm_fit.forecast(7).to_numpy(), full_fit.forecast(7).to_numpy(), rtol=1e-3)
+
+
+def test_grid_fit_sse_within_one_percent(daily_sales, full_fit):
+    grid_fit = fit_holt_winters(daily_sales.to_numpy(), 7)
+    assert grid_fit["sse"][0] <= full_fit.sse * 1.01
+
+
+def test_grid_fit_chunking_is_exact(daily_sales):
+    rng = np.random.default_rng(0)
+    Y = daily_sales.to_numpy() + rng.normal(0, 3, (5, len(daily_sales)))
+
+    single = fit_holt_winters(Y, 7, max_rows=10 ** 6)
+    chunked = fit_holt_winters(Y, 7, max_rows=64)
+
+    for name in single:
+        np.testing.assert_allclose(chunked[name], single[name])
+
+
+def test_initial_states_need_a_full_season():
+    with pytest.raises(ValueError):
+        initial_states(np.arange(6.0), 7)
+
+
+def test_grid_fit_rejects_missing_values(daily_sales):
+    Y = np.vstack([daily_sales.to_numpy(), daily_sales.to_numpy()]).astype(float)
+    Y[1, 10] = np.nan
+
+    with pytest.raises(ValueError):
+        fit_holt_winters(Y, 7)
+    with pytest.raises(ValueError):
+        forecast_many(Y, 7)
+
+
+def test_update_modes(daily_sales):
+    engine = IncrementalForecaster(full_refit_every=3)
+    base = daily_sales.iloc[:-4]
+
+    assert engine.update("all", base)[1] == "full"
+    assert engine.update("all", base)[1] == "cached"
+    assert engine.update("all", daily_sales.iloc[:-3])[1] == "warm"
+    assert engine.update("all", daily_sales.iloc[:-2])[1] == "warm"
+    # Third appended day since the last full fit
+    assert engine.update("all", daily_sales.iloc[:-1])[1] == "full"
+
+
+def test_update_refits_on_drift(daily_sales):
+    engine = IncrementalForecaster()
+    engine.update("all", daily_sales.iloc[:-1])
+
+    spiked = daily_sales.astype(float)
+    spiked.iloc[-1] += 100 * daily_sales.std()
+    assert engine.update("all", spiked)[1] == "full"
+
+
+def test_update_refits_when_history_changes(daily_sales):
+    engine = IncrementalForecaster()
+    engine.update("all", daily_sales)
+
+    edited = daily_sales.copy()
+    edited.iloc[0] += 1
+    assert engine.update("all", edited)[1] == "full"
@@ -0,0 +1,7 @@
+"""
+Analytics helpers shared by the insights service (analytics/insights) and
+the analytics service (sales-analytics-llm).
+
+Install once from the repository root with:
+    pip install -e ./analytics/shared
+"""
@@ -0,0 +1,397 @@
+# export.py
+"""
+Bulk export of sales rows and rollups as Arrow IPC or Parquet.
+
+Rows are read from the CSV or the Mongo cursor in record batches, filtered
+with the same start_date/end_date/category/item_type semantics as
+`insights()` and written batch by batch, so memory stays bounded by the
+batch size (or by the number of groups for rollups).
+
+CLI (from the repository root, or pass --csv-path / set SALES_CSV_PATH):
+    python -m smartsahuji_analytics.export --source csv --format parquet --out sales.parquet
+    python -m smartsahuji_analytics.export --source mongo --rollup period,category --period monthly --out monthly.arrow
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+# Same columns and defaults as load_data()
+EXPORT_SCHEMA = pa.schema([
+    ("date", pa.timestamp("ms")),
+    ("product", pa.string()),
+    ("category", pa.string()),
+    ("item_type", pa.string()),
+    ("price", pa.float64()),
+    ("cost", pa.float64()),
+    ("quantity", pa.float64()),
+])
+
+DEFAULTS = {
+    "product": "Unknown",
+    "category": "Unknown",
+    "item_type": "Unknown",
+    "price": 0.0,
+    "cost": 0.0,
+    "quantity": 1.0,
+}
+
+PERIOD_FORMATS = {
+    "daily": "%Y-%m-%d",
+    "weekly": "%Y-%U",
+    "monthly": "%Y-%m",
+    "yearly": "%Y",
+}
+
+ROLLUP_DIMENSIONS = ["period", "category", "item_type", "product"]
+
+ROLLUP_MEASURES = ["revenue", "profit", "quantity", "orders"]
+
+# Resolved from the working directory (the repo root), not the install location
+DEFAULT_CSV_PATH = os.getenv("SALES_CSV_PATH", os.path.join("data", "sales_500.csv"))
+
+# Upper bound for rows per batch; keeps a single batch's memory in check
+MAX_BATCH_SIZE = 1_000_000
+
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportRequestError(ValueError):
+    """Invalid export arguments (format, period, rollup, batch_size)."""
+
+
+# ==============================
+# BATCH NORMALIZATION & FILTERS
+# ==============================
+def normalize_batch(batch):
+    """Casts a batch to EXPORT_SCHEMA, filling missing columns and nulls like load_data()."""
+    columns = []
+    for field in EXPORT_SCHEMA:
+        if field.name in batch.schema.names:
+            column = batch.column(field.name)
+            try:
+                column = column.cast(field.type, safe=False)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                # Mixed or unparseable values become null, like errors="coerce"
+                column = pa.array(
+                    [CONVERTERS[field.name](v) for v in column.to_pylist()], type=field.type
+                )
+        else:
+            column = pa.nulls(batch.num_rows, field.type)
+
+        if field.name in DEFAULTS:
+            column = pc.fill_null(column, pa.scalar(DEFAULTS[field.name], field.type))
+        columns.append(column)
+
+    return pa.RecordBatch.from_arrays(columns, schema=EXPORT_SCHEMA)
+
+
+def filter_batch(batch, start_date=None, end_date=None, category=None, item_type=None):
+    conditions = []
+    if start_date:
+        conditions.append(pc.greater_equal(batch["date"], pa.scalar(pd.to_datetime(start_date), pa.timestamp("ms"))))
+    if end_date:
+        conditions.append(pc.less_equal(batch["date"], pa.scalar(pd.to_datetime(end_date), pa.timestamp("ms"))))
+    if category:
+        conditions.append(pc.equal(batch["category"], category))
+    if item_type:
+        conditions.append(pc.equal(batch["item_type"], item_type))
+
+    if not conditions:
+        return batch
+
+    mask = conditions[0]
+    for condition in conditions[1:]:
+        mask = pc.and_(mask, condition)
+
+    # Rows with a null date are dropped by date filters, like NaT in pandas
+    return batch.filter(mask)
+
+
+# ==============================
+# SOURCES
+# ==============================
+def iter_csv_batches(path, batch_size=65536, **filters):
+    """Streams the CSV in blocks of roughly `batch_size` rows."""
+    reader = pv.open_csv(
+        path,
+        # ~128 bytes per sales row
+        read_options=pv.ReadOptions(block_size=max(batch_size * 128, 1 << 16)),
+        convert_options=pv.ConvertOptions(
+            # Read as strings so bad cells are coerced by normalize_batch(), like load_data();
+            # types guessed from the first block would abort later blocks instead
+            column_types={name: pa.string() for name in ["date", "price", "cost", "quantity"]},
+            strings_can_be_null=True,
+        ),
+    )
+    for batch in reader:
+        batch = filter_batch(normalize_batch(batch), **filters)
+        if batch.num_rows:
+            yield batch
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    try:
+        return pd.to_datetime(value).to_pydatetime()
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_str(value):
+    return None if value is None else str(value)
+
+
+CONVERTERS = {
+    "date": _to_datetime,
+    "product": _to_str,
+    "category": _to_str,
+    "item_type": _to_str,
+    "price": _to_float,
+    "cost": _to_float,
+    "quantity": _to_float,
+}
+
+
+def mongo_query(start_date=None, end_date=None, category=None, item_type=None):
+    query = {}
+    if start_date or end_date:
+        query["date"] = {}
+        if start_date:
+            query["date"]["$gte"] = pd.to_datetime(start_date).to_pydatetime()
+        if end_date:
+            query["date"]["$lte"] = pd.to_datetime(end_date).to_pydatetime()
+    if category:
+        query["category"] = category if category != "Unknown" else {"$in": [category, None]}
+    if item_type:
+        query["item_type"] = item_type if item_type != "Unknown" else {"$in": [item_type, None]}
+    return query
+
+
+def iter_mongo_batches(collection, batch_size=65536, **filters):
+    """Streams matching documents from the cursor in batches of `batch_size` rows."""
+    cursor = collection.find(
+        mongo_query(**filters),
+        projection={name: 1 for name in EXPORT_SCHEMA.names} | {"_id": 0},
+        batch_size=batch_size,
+    )
+
+    def to_batch(docs):
+        arrays = [
+            pa.array([CONVERTERS[name](doc.get(name)) for doc in docs], type=EXPORT_SCHEMA.field(name).type)
+            for name in EXPORT_SCHEMA.names
+        ]
+        # Filters run again so Mongo and CSV exports agree on defaults
+        return filter_batch(normalize_batch(pa.RecordBatch.from_arrays(arrays, schema=EXPORT_SCHEMA)), **filters)
+
+    docs = []
+    for doc in cursor:
+        docs.append(doc)
+        if len(docs) == batch_size:
+            batch = to_batch(docs)
+            docs = []
+            if batch.num_rows:
+                yield batch
+    if docs:
+        batch = to_batch(docs)
+        if batch.num_rows:
+            yield batch
+
+
+# ==============================
+# ROLLUPS
+# ==============================
+def rollup_batches(batches, dimensions, period="daily", batch_size=65536):
+    """
+    Aggregates revenue, profit, quantity and orders by `dimensions`.
+
+    Each batch is folded into the running sums as it arrives, so memory is
+    bounded by the number of groups rather than the number of rows.
+    """
+    aggregations = [(name, "sum") for name in ROLLUP_MEASURES]
+    totals = pa.schema(
+        [(dim, pa.string()) for dim in dimensions]
+        + [("revenue", pa.float64()), ("profit", pa.float64()),
+           ("quantity", pa.float64()), ("orders", pa.int64())]
+    ).empty_table()
+
+    for batch in batches:
+        revenue = pc.multiply(batch["price"], batch["quantity"])
+        columns = {
+            dim: pc.strftime(batch["date"], PERIOD_FORMATS[period]) if dim == "period" else batch[dim]
+            for dim in dimensions
+        }
+        columns["revenue"] = revenue
+        columns["profit"] = pc.subtract(revenue, pc.multiply(batch["cost"], batch["quantity"]))
+        columns["quantity"] = batch["quantity"]
+        columns["orders"] = pa.array(np.ones(batch.num_rows, dtype=np.int64))
+
+        totals = _strip_suffixes(
+            pa.concat_tables([totals, pa.table(columns)]).group_by(dimensions).aggregate(aggregations)
+        ).select(totals.column_names)
+
+    totals = totals.sort_by([(dim, "ascending") for dim in dimensions])
+    batches = totals.to_batches(max_chunksize=batch_size)
+    yield from batches or [pa.RecordBatch.from_pylist([], schema=totals.schema)]
+
+
+def _strip_suffixes(table):
+    # group_by().aggregate() names columns "revenue_sum"; keep the source names
+    return table.rename_columns([name.removesuffix("_sum") for name in table.column_names])
+
+
+# ==============================
+# WRITERS
+# ==============================
+class _ChunkSink:
+    """File-like object that hands written bytes back to the caller."""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_batches(first, batches, fmt="arrow"):
+    """
+    Yields the encoded Arrow IPC stream or Parquet file chunk by chunk,
+    starting with the already-read `first` batch (None when empty).
+    """
+    schema = first.schema if first is not None else EXPORT_SCHEMA
+
+    sink = _ChunkSink()
+    if fmt == "arrow":
+        writer = pa.ipc.new_stream(sink, schema)
+    else:
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+
+    try:
+        if first is not None:
+            writer.write_batch(first)
+            yield sink.drain()
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_stream(batches, fmt="arrow", rollup=None, period="daily", batch_size=65536):
+    """
+    Raw rows, or a rollup when `rollup` lists dimensions (comma separated),
+    encoded as `fmt` ('arrow' or 'parquet').
+
+    Arguments are validated and the first batch is read here, before any
+    bytes are produced, so callers can still turn an ExportRequestError
+    into a 400 and a source failure (missing CSV, Mongo error) into a 5xx.
+    """
+    if fmt not in MEDIA_TYPES:
+        raise ExportRequestError("Invalid format")
+    if not 0 < batch_size <= MAX_BATCH_SIZE:
+        raise ExportRequestError(f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+    if period not in PERIOD_FORMATS:
+        raise ExportRequestError("Invalid period")
+
+    if rollup is not None:
+        # Duplicates are dropped (keeping order); they would break the group-by schema
+        dimensions = list(dict.fromkeys(d.strip() for d in rollup.split(",") if d.strip()))
+        if not dimensions:
+            raise ExportRequestError("Rollup needs at least one dimension: " + ", ".join(ROLLUP_DIMENSIONS))
+        invalid = [d for d in dimensions if d not in ROLLUP_DIMENSIONS]
+        if invalid:
+            raise ExportRequestError(f"Invalid rollup dimension(s): {', '.join(invalid)}")
+        batches = rollup_batches(batches, dimensions, period, batch_size)
+
+    # Opens the CSV / runs the Mongo query (and, for rollups, aggregates)
+    batches = iter(batches)
+    first = next(batches, None)
+    return stream_batches(first, batches, fmt)
+
+
+# ==============================
+# CLI
+# ==============================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export sales rows or rollups as Arrow IPC / Parquet")
+    parser.add_argument("--source", choices=["csv", "mongo"], default="csv")
+    parser.add_argument("--csv-path", default=DEFAULT_CSV_PATH,
+                        help="CSV source, relative to the working directory (default: %(default)s)")
+    parser.add_argument("--format", choices=list(MEDIA_TYPES), default="parquet")
+    parser.add_argument("--out", help="Output file (default: stdout)")
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--category")
+    parser.add_argument("--item-type")
+    parser.add_argument("--rollup", help="Comma separated: " + ", ".join(ROLLUP_DIMENSIONS))
+    parser.add_argument("--period", choices=list(PERIOD_FORMATS), default="daily")
+    parser.add_argument("--batch-size", type=int, default=65536)
+    args = parser.parse_args(argv)
+
+    filters = {
+        "start_date": args.start_date,
+        "end_date": args.end_date,
+        "category": args.category,
+        "item_type": args.item_type,
+    }
+
+    if args.source == "mongo":
+        from dotenv import load_dotenv
+        from pymongo import MongoClient
+
+        load_dotenv()
+        client = MongoClient(os.getenv("MONGO_URI"))
+        collection = client[os.getenv("DB_NAME")][os.getenv("COLLECTION_NAME")]
+        batches = iter_mongo_batches(collection, args.batch_size, **filters)
+    else:
+        batches = iter_csv_batches(args.csv_path, args.batch_size, **filters)
+
+    try:
+        stream = export_stream(batches, args.format, args.rollup, args.period, args.batch_size)
+    except (ExportRequestError, FileNotFoundError) as e:
+        parser.error(str(e))
+
+    out = open(args.out, "wb") if args.out else sys.stdout.buffer
+    try:
+        for chunk in stream:
+            out.write(chunk)
+    finally:
+        if args.out:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# precompute.py
+"""
+Background precomputation of the most common dashboard queries.
+
+Results are stored with the data version they were computed from and are
+served as-is while a newer version is being computed (stale-while-revalidate).
+Jobs run on their own small thread pool so they never take threads away
+from live requests.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+
+class Precomputer:
+    def __init__(self, data_version, refresh_interval=600, poll_interval=30, max_workers=1):
+        """
+        :param data_version: zero-arg callable returning a cheap, hashable
+            fingerprint of the data (changes whenever the data changes)
+        :param refresh_interval: seconds after which results are recomputed
+            even if the data version did not change
+        :param poll_interval: seconds between data version checks
+        :param max_workers: threads used for precomputation
+        """
+        self.data_version = data_version
+        self.refresh_interval = refresh_interval
+        self.poll_interval = poll_interval
+        self.max_workers = max_workers
+
+        self.version = None
+        self.refreshed_at = None
+        self._force = False
+        self._job_source = None
+        self._results = {}
+        self._executor = None
+        self._loop = None
+        self._wake = None
+
+    # ==============================
+    # REGISTRATION & LOOKUP
+    # ==============================
+    def jobs(self, fn):
+        """
+        Registers the job source (usable as a decorator).
+
+        `fn` returns a list of (name, params, callable) tuples; each callable
+        takes no arguments and returns the result served for (name, params).
+        """
+        self._job_source = fn
+        return fn
+
+    @staticmethod
+    def key(name, **params):
+        # Unset filters are ignored so defaults and explicit None share a key
+        return (name, tuple(sorted((k, v) for k, v in params.items() if v is not None)))
+
+    def get(self, name, **params):
+        """
+        Returns the latest precomputed result, possibly from an older data
+        version, or None if it has not been computed yet.
+        """
+        entry = self._results.get(self.key(name, **params))
+        return entry["result"] if entry else None
+
+    def invalidate(self):
+        """Requests a recompute as soon as possible (thread-safe)."""
+        self._force = True
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def status(self):
+        now = time.time()
+        results = self._results  # refresh() swaps in new dicts, never mutates this one
+        return {
+            "data_version": str(self.version),
+            "refreshed_seconds_ago": None if self.refreshed_at is None else now - self.refreshed_at,
+            "entries": [
+                {
+                    "name": name,
+                    "params": dict(params),
+                    "data_version": str(entry["version"]),
+                    "age_seconds": now - entry["computed_at"],
+                }
+                for (name, params), entry in results.items()
+            ],
+        }
+
+    # ==============================
+    # BACKGROUND LOOP
+    # ==============================
+    async def _in_executor(self, fn):
+        return await self._loop.run_in_executor(self._executor, fn)
+
+    async def refresh(self, version):
+        if self._job_source is None:
+            return
+
+        jobs = await self._in_executor(self._job_source)
+        keys = set()
+
+        for name, params, fn in jobs:
+            key = self.key(name, **params)
+            keys.add(key)
+            try:
+                result = await self._in_executor(fn)
+            except Exception as e:
+                # Keep serving the previous result for this key
+                print(f"Precompute {name} {params} failed: {e}")
+                continue
+            # Copy-on-write: request threads only ever read a complete dict
+            self._results = {**self._results, key: {
+                "version": version,
+                "computed_at": time.time(),
+                "result": result,
+            }}
+
+        # Drop results for jobs that no longer exist (e.g. removed categories)
+        self._results = {key: entry for key, entry in self._results.items() if key in keys}
+
+        self.version = version
+        self.refreshed_at = time.time()
+
+    async def run(self):
+        while True:
+            try:
+                version = await self._in_executor(self.data_version)
+                expired = (
+                    self.refreshed_at is None
+                    or time.time() - self.refreshed_at >= self.refresh_interval
+                )
+                if self._force or version != self.version or expired:
+                    self._force = False
+                    await self.refresh(version)
+            except Exception as e:
+                print(f"Precompute refresh failed: {e}")
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    @asynccontextmanager
+    async def lifespan(self, app):
+        """FastAPI lifespan that runs the refresh loop for the app's lifetime."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="precompute"
+        )
+        task = asyncio.create_task(self.run())
+        try:
+            yield
+        finally:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._loop = None
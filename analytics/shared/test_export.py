@@ -0,0 +1,91 @@
+# test_export.py
+"""
+Filters, rollups and bad-cell handling of the Arrow / Parquet export.
+"""
+
+import io
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from smartsahuji_analytics.export import export_stream, iter_csv_batches
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "sales_500.csv")
+
+
+def read_arrow(chunks):
+    return pa.ipc.open_stream(io.BytesIO(b"".join(chunks))).read_all()
+
+
+def test_bad_cells_in_a_later_block_are_coerced(tmp_path):
+    df = pd.read_csv(DATA_PATH).astype({"date": object, "cost": object})
+    df.loc[len(df) - 1, "date"] = "not-a-date"
+    df.loc[len(df) - 2, "cost"] = "abc"
+    path = tmp_path / "bad.csv"
+    df.to_csv(path, index=False)
+
+    # Small batches put the bad rows in the last of several CSV blocks
+    batches = list(iter_csv_batches(path, batch_size=1))
+    table = pa.Table.from_batches(batches)
+
+    assert len(batches) > 1
+    assert table.num_rows == len(df)
+    assert table["date"][len(df) - 1].as_py() is None
+    assert table["cost"][len(df) - 2].as_py() == 0.0
+
+
+@pytest.mark.parametrize("rollup", [",", "", " , ", "category,nope"])
+def test_invalid_rollups_fail_before_streaming(rollup):
+    with pytest.raises(ValueError):
+        export_stream(iter_csv_batches(DATA_PATH), rollup=rollup)
+
+
+def test_duplicate_rollup_dimensions_are_merged():
+    once = read_arrow(export_stream(iter_csv_batches(DATA_PATH), rollup="category"))
+    twice = read_arrow(export_stream(iter_csv_batches(DATA_PATH), rollup="category, category"))
+    assert twice.equals(once)
+
+
+def test_filters_match_pandas():
+    df = pd.read_csv(DATA_PATH, parse_dates=["date"])
+    expected = df[(df["date"] >= "2026-01-10") & (df["date"] <= "2026-02-01") & (df["category"] == "Electronics")]
+
+    table = read_arrow(export_stream(iter_csv_batches(
+        DATA_PATH, start_date="2026-01-10", end_date="2026-02-01", category="Electronics"
+    )))
+    assert table.num_rows == len(expected)
+
+
+def test_rollup_matches_pandas():
+    df = pd.read_csv(DATA_PATH, parse_dates=["date"])
+    df["period"] = df["date"].dt.strftime("%Y-%m")
+    df["revenue"] = df["price"] * df["quantity"]
+    expected = df.groupby(["period", "category"])["revenue"].sum()
+
+    table = read_arrow(export_stream(
+        iter_csv_batches(DATA_PATH, batch_size=50), rollup="period,category", period="monthly"
+    )).to_pandas().set_index(["period", "category"])
+    pd.testing.assert_series_equal(table["revenue"], expected.astype(float), check_names=False)
+    assert table["orders"].sum() == len(df)
+
+
+@pytest.mark.parametrize("rollup", [None, "category"])
+def test_empty_results_are_valid_files(rollup):
+    batches = iter_csv_batches(DATA_PATH, category="Nope")
+
+    table = read_arrow(export_stream(batches, rollup=rollup))
+    assert table.num_rows == 0
+    assert "category" in table.column_names
+
+    parquet = pq.read_table(io.BytesIO(b"".join(
+        export_stream(iter_csv_batches(DATA_PATH, category="Nope"), "parquet", rollup=rollup)
+    )))
+    assert parquet.num_rows == 0
+
+
+def test_missing_source_fails_before_streaming(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        export_stream(iter_csv_batches(tmp_path / "missing.csv"))
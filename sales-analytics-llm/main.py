@@ -4,8 +4,12 @@ import os
 import pandas as pd
 from pymongo import MongoClient
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+
+from smartsahuji_analytics.precompute import Precomputer
+from smartsahuji_analytics.export import MAX_BATCH_SIZE, MEDIA_TYPES, ExportRequestError, export_stream, iter_mongo_batches
 
 # ==============================
 # LOAD ENV
@@ -26,10 +30,25 @@ client = MongoClient(MONGO_URI)
 db = client[DB_NAME]
 collection = db[COLLECTION_NAME]
 
+# ==============================
+# BACKGROUND PRECOMPUTATION
+# ==============================
+def data_version():
+    # Inserts and deletes change the count, new documents change the latest _id
+    latest = collection.find_one(sort=[("_id", -1)], projection={"_id": 1})
+    return (collection.estimated_document_count(), latest["_id"] if latest else None)
+
+precomputed = Precomputer(
+    data_version,
+    refresh_interval=int(os.getenv("PRECOMPUTE_INTERVAL", 600)),
+    poll_interval=int(os.getenv("PRECOMPUTE_POLL_INTERVAL", 30)),
+    max_workers=int(os.getenv("PRECOMPUTE_WORKERS", 1)),
+)
+
 # ==============================
 # FASTAPI SETUP
 # ==============================
-app = FastAPI()
+app = FastAPI(lifespan=precomputed.lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -95,8 +114,16 @@ def analytics(
     end_date: str = None,
     category: str = None
 ):
-    df = load_data()
+    cached = precomputed.get(
+        "analytics", period=period, start_date=start_date, end_date=end_date, category=category
+    )
+    if cached is not None:
+        return cached
 
+    return compute_analytics(load_data(), period, start_date, end_date, category)
+
+
+def compute_analytics(df, period="weekly", start_date=None, end_date=None, category=None):
     if df.empty:
         return {
             "summary": {
@@ -219,3 +246,63 @@ def analytics(
         "top_products": top_products,
         "top_margin_products": top_margin_products,
     }
+
+
+# ==============================
+# BULK EXPORT ENDPOINT
+# ==============================
+@app.get("/export")
+def export_sales(
+    format: str = "arrow",
+    start_date: str = None,
+    end_date: str = None,
+    category: str = None,
+    item_type: str = None,
+    rollup: str = None,
+    period: str = "daily",
+    batch_size: int = Query(65536, gt=0, le=MAX_BATCH_SIZE)
+):
+    """
+    Stream filtered sales rows, or a rollup by `rollup` dimensions
+    (e.g. "period,category"), as Arrow IPC or Parquet record batches
+    read straight from the Mongo cursor.
+    """
+    batches = iter_mongo_batches(
+        collection, batch_size,
+        start_date=start_date, end_date=end_date, category=category, item_type=item_type
+    )
+    # Reads the first batch, so a missing CSV or Mongo error is a 500, not a cut-off 200
+    try:
+        stream = export_stream(batches, format, rollup, period, batch_size)
+    except ExportRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        stream,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="sales.{format}"'}
+    )
+
+
+# ==============================
+# PRECOMPUTED QUERIES
+# ==============================
+@precomputed.jobs
+def precompute_jobs():
+    """
+    Default dashboard query: unfiltered weekly analytics.
+    """
+    df = load_data()
+    return [("analytics", {"period": "weekly"}, lambda: compute_analytics(df, "weekly"))]
+
+
+@app.get("/precompute/status")
+def precompute_status():
+    return precomputed.status()
+
+
+@app.post("/precompute/refresh")
+def precompute_refresh():
+    # Called after data changes (e.g. uploads) to recompute right away
+    precomputed.invalidate()
+    return {"message": "Refresh scheduled"}
@@ -7,6 +7,7 @@ for Inventory & Sales Management Systems.
 
 import pandas as pd
 from datetime import datetime
+from smartsahuji_analytics.trends import compute_trends
 
 class SalesAnalytics:
     def __init__(self, sales_df: pd.DataFrame, inventory_df: pd.DataFrame = None):
@@ -54,7 +55,8 @@ class SalesAnalytics:
         total_profit = self.sales['profit'].sum()
         gross_margin = (total_profit / total_revenue * 100) if total_revenue else 0
         avg_order_value = self.sales['revenue'].mean()
-        sales_growth = self.compute_sales_growth()
+        trends = self.compute_trends()
+        sales_growth = trends['overall']['latest_growth_pct'] or 0
         category_contrib = self.sales.groupby('category')['revenue'].sum().to_dict()
 
         return {
@@ -63,7 +65,8 @@ class SalesAnalytics:
             'gross_margin': gross_margin,
             'average_order_value': avg_order_value,
             'sales_growth': sales_growth,
-            'category_contribution': category_contrib
+            'category_contribution': category_contrib,
+            'revenue_trends': trends
         }
 
     # ----------------------------
@@ -89,12 +92,16 @@ class SalesAnalytics:
         """
         Calculates percentage growth between last two months.
         """
-        df = self.aggregate_by_period('M')
-        if len(df) < 2:
-            return 0
-        prev, curr = df['revenue'].iloc[-2], df['revenue'].iloc[-1]
-        growth = ((curr - prev) / prev * 100) if prev != 0 else 0
-        return growth
+        return self.compute_trends()['overall']['latest_growth_pct'] or 0
+
+    def compute_trends(self, by='category', period='M', window=3):
+        """
+        Growth, least-squares slope and rolling growth for all sales and
+        every `by` group, computed in one vectorized pass.
+        :param period: pandas period frequency, e.g. 'W-SAT', 'M', 'Y'
+        :param window: number of periods compared by the rolling growth
+        """
+        return compute_trends(self.sales, value='revenue', by=by, freq=period, window=window)
 
     # ----------------------------
     # 5️⃣ Decision Support / Insights